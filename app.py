@@ -1,5 +1,5 @@
 import streamlit as st
-import pandas as pd
+import numpy as np
 import joblib
 import json
 import sys
@@ -8,7 +8,8 @@ import os
 # Ensure 'src' folder is accessible for imports
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), 'src')))
 
-from src.preprocessing import preprocess_data
+from src.preprocessing import encode_row
+from src.inference import PredictionBatcher
 
 # 1. Page Configuration
 st.set_page_config(page_title="Kidney Disease AI", layout="wide")
@@ -17,124 +18,139 @@ st.title("🏥 Kidney Disease Prediction System")
 st.markdown("Enter the patient's lab results below to analyze the risk of Chronic Kidney Disease (CKD).")
 
 # 2. Load Model and Feature Names
+# Cached separately: the feature list is a tiny JSON file, so reloading it never forces a model reload
 @st.cache_resource # Cache the model to optimize performance
-def load_resources():
+def load_model():
     try:
         model = joblib.load('models/kidney_model.joblib')
+        # All predictions run on the batcher's worker thread in batches of at most 64 rows. Scoring a
+        # full batch takes ~2.6 ms on one core, less than the ~9 ms a per-call joblib thread pool
+        # adds, so the forest scores on that thread alone
+        model.set_params(n_jobs=1)
+        # Warm-up call so the first "Analyze Risk" click doesn't pay one-off initialisation costs
+        model.predict_proba(np.zeros((1, model.n_features_in_), dtype=np.float32))
+        return model
+    except FileNotFoundError:
+        return None
+
+@st.cache_resource
+def load_batcher(_model):
+    # One batcher per process, shared by every session so concurrent clicks are scored together.
+    # `_model` is not hashed: load_model() is itself cached once per process, so it is always the same object
+    return PredictionBatcher(_model)
+
+@st.cache_data
+def load_features():
+    try:
         with open('models/model_features.json', 'r') as f:
-            feature_names = json.load(f)
-        return model, feature_names
+            return json.load(f)
     except FileNotFoundError:
-        return None, None
+        return None
 
-model, feature_names = load_resources()
+model = load_model()
+feature_names = load_features()
 
-if model is None:
+if model is None or feature_names is None:
     st.error("🚨 Error: Model files not found! Please run 'python src/train.py' first.")
     st.stop()
 
+batcher = load_batcher(model)
+
+@st.cache_data(max_entries=128, show_spinner=False)
+def predict_probability(input_items):
+    # Keyed on the submitted (feature, value) pairs: re-submitting an identical form skips encoding and scoring
+    features = encode_row(dict(input_items), feature_names)
+    return batcher.predict_proba(features)[1]
+
 # 3. Input Form (Updated for New Top 15 Features)
+# Each section is a list of form columns; each field is (exact feature name, widget, widget arguments)
+FORM_SECTIONS = [
+    # --- Section 1: Urine Analysis (The most critical indicators now) ---
+    ("1. Urine Analysis Results", [
+        [
+            ('Urine protein-to-creatinine ratio', 'number', dict(label="Urine Protein-to-Creatinine Ratio", min_value=0.0, max_value=10.0, value=0.2, step=0.1, help="Normal range is typically < 0.2")),
+            ('Albumin in urine', 'select', dict(label="Albumin in Urine", options=[0, 1, 2, 3, 4, 5], help="0=None, 1=Trace, 2-5=Levels")),
+        ],
+        [
+            ('Urinary sediment microscopy results', 'select', dict(label="Urinary Sediment Microscopy", options=["normal", "abnormal"])),
+            ('Pus cells in urine', 'select', dict(label="Pus Cells in Urine", options=["normal", "abnormal"])),
+        ],
+        [
+            ('Red blood cells in urine', 'select', dict(label="Red Blood Cells (Urine)", options=["normal", "abnormal"])),
+        ],
+    ]),
+    # --- Section 2: Kidney Function & Blood ---
+    ("2. Kidney Function & Blood Tests", [
+        [
+            ('Serum creatinine (mg/dl)', 'number', dict(label="Serum Creatinine (mg/dl)", min_value=0.0, max_value=20.0, value=0.9, step=0.1)),
+            ('Estimated Glomerular Filtration Rate (eGFR)', 'number', dict(label="eGFR", min_value=0.0, max_value=150.0, value=100.0, step=1.0)),
+        ],
+        [
+            ('Cystatin C level', 'number', dict(label="Cystatin C level (mg/l)", min_value=0.0, max_value=10.0, value=0.8, step=0.1)),
+            ('Blood urea (mg/dl)', 'number', dict(label="Blood Urea (mg/dl)", min_value=0.0, max_value=300.0, value=30.0, step=1.0)),
+        ],
+        [
+            ('Parathyroid hormone (PTH) level', 'number', dict(label="Parathyroid Hormone (PTH)", min_value=0.0, max_value=1000.0, value=40.0, step=1.0)),
+        ],
+    ]),
+    # --- Section 3: Inflammation & History ---
+    ("3. Clinical History & Inflammation", [
+        [
+            ('Interleukin-6 (IL-6) level', 'number', dict(label="Interleukin-6 (IL-6)", min_value=0.0, max_value=200.0, value=2.0, step=0.1)),
+            ('C-reactive protein (CRP) level', 'number', dict(label="CRP Level", min_value=0.0, max_value=200.0, value=1.0, step=0.1)),
+        ],
+        [
+            ('Blood pressure (mm/Hg)', 'number', dict(label="Blood Pressure (mm/Hg)", min_value=50, max_value=250, value=120)),
+            ('Coronary artery disease (yes/no)', 'select', dict(label="Coronary Artery Disease", options=["no", "yes"])),
+        ],
+        [
+            ('Appetite (good/poor)', 'select', dict(label="Appetite", options=["good", "poor"])),
+        ],
+    ]),
+]
+
+WIDGETS = {'number': st.number_input, 'select': st.selectbox}
+
 with st.form("prediction_form"):
     st.header("📝 Patient Data Entry")
-    
-    # --- Section 1: Urine Analysis (The most critical indicators now) ---
-    st.subheader("1. Urine Analysis Results")
-    col1, col2, col3 = st.columns(3)
-    
-    with col1:
-        protein_ratio = st.number_input("Urine Protein-to-Creatinine Ratio", min_value=0.0, max_value=10.0, value=0.2, step=0.1, help="Normal range is typically < 0.2")
-        albumin_urine = st.selectbox("Albumin in Urine", options=[0, 1, 2, 3, 4, 5], help="0=None, 1=Trace, 2-5=Levels")
-    
-    with col2:
-        urine_sediment = st.selectbox("Urinary Sediment Microscopy", options=["normal", "abnormal"])
-        pus_cells = st.selectbox("Pus Cells in Urine", options=["normal", "abnormal"])
-    
-    with col3:
-        rbc_urine = st.selectbox("Red Blood Cells (Urine)", options=["normal", "abnormal"])
-
-    st.markdown("---")
 
-    # --- Section 2: Kidney Function & Blood ---
-    st.subheader("2. Kidney Function & Blood Tests")
-    col1, col2, col3 = st.columns(3)
-    
-    with col1:
-        creatinine = st.number_input("Serum Creatinine (mg/dl)", min_value=0.0, max_value=20.0, value=0.9, step=0.1)
-        egfr = st.number_input("eGFR", min_value=0.0, max_value=150.0, value=100.0, step=1.0)
-    
-    with col2:
-        cystatin = st.number_input("Cystatin C level (mg/l)", min_value=0.0, max_value=10.0, value=0.8, step=0.1)
-        urea = st.number_input("Blood Urea (mg/dl)", min_value=0.0, max_value=300.0, value=30.0, step=1.0)
-    
-    with col3:
-        pth = st.number_input("Parathyroid Hormone (PTH)", min_value=0.0, max_value=1000.0, value=40.0, step=1.0)
-
-    st.markdown("---")
+    # Dictionary keyed by the EXACT Top 15 Feature Names
+    input_data = {}
 
-    # --- Section 3: Inflammation & History ---
-    st.subheader("3. Clinical History & Inflammation")
-    col1, col2, col3 = st.columns(3)
-    
-    with col1:
-        il6 = st.number_input("Interleukin-6 (IL-6)", min_value=0.0, max_value=200.0, value=2.0, step=0.1)
-        crp = st.number_input("CRP Level", min_value=0.0, max_value=200.0, value=1.0, step=0.1)
-    
-    with col2:
-        bp = st.number_input("Blood Pressure (mm/Hg)", min_value=50, max_value=250, value=120)
-        cad = st.selectbox("Coronary Artery Disease", options=["no", "yes"])
-    
-    with col3:
-        appetite = st.selectbox("Appetite", options=["good", "poor"])
+    for i, (title, form_columns) in enumerate(FORM_SECTIONS):
+        if i > 0:
+            st.markdown("---")
+
+        st.subheader(title)
+        for col, fields in zip(st.columns(len(form_columns)), form_columns):
+            with col:
+                for feature, widget, cfg in fields:
+                    input_data[feature] = WIDGETS[widget](**cfg)
 
     # Submit Button
     submitted = st.form_submit_button("🔍 Analyze Risk")
 
 # 4. Prediction Logic
 if submitted:
-    # Dictionary matching the EXACT Top 15 Feature Names
-    input_data = {
-        'Urine protein-to-creatinine ratio': protein_ratio,
-        'Serum creatinine (mg/dl)': creatinine,
-        'Estimated Glomerular Filtration Rate (eGFR)': egfr,
-        'Cystatin C level': cystatin,
-        'Albumin in urine': albumin_urine,
-        'Interleukin-6 (IL-6) level': il6,
-        'Urinary sediment microscopy results': urine_sediment,
-        'Blood urea (mg/dl)': urea,
-        'Red blood cells in urine': rbc_urine,
-        'Parathyroid hormone (PTH) level': pth,
-        'Pus cells in urine': pus_cells,
-        'C-reactive protein (CRP) level': crp,
-        'Coronary artery disease (yes/no)': cad,
-        'Blood pressure (mm/Hg)': bp,
-        'Appetite (good/poor)': appetite
-    }
-
-    # Convert to DataFrame
-    user_df = pd.DataFrame([input_data])
-
     try:
-        # Preprocess and align data
-        clean_df = preprocess_data(user_df)
-        final_df = clean_df[feature_names]
-
         # Make Prediction
-        prediction = model.predict(final_df)
-        probability = model.predict_proba(final_df)[0][1] # Probability of Class 1 (Disease)
+        probability = predict_probability(tuple(input_data.items())) # Probability of Class 1 (Disease)
+        # Same decision as model.predict(): argmax over [healthy, disease]
+        is_sick = probability > 0.5
 
         st.divider()
         
         col_res1, col_res2 = st.columns([1, 3])
         
         with col_res1:
-            if prediction[0] == 1:
+            if is_sick:
                 st.metric(label="Risk Level", value="High Risk ⚠️", delta="- Alert")
             else:
                 st.metric(label="Risk Level", value="Low Risk ✅", delta="Normal")
 
         with col_res2:
             st.progress(float(probability))
-            if prediction[0] == 1:
+            if is_sick:
                 st.error(f"**Potential Chronic Kidney Disease Detected** (Confidence: {probability:.1%})")
                 st.write("The model suggests a high likelihood of kidney issues based on the provided urine analysis and clinical markers.")
             else:
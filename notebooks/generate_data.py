@@ -1,9 +1,9 @@
 import pandas as pd
 import numpy as np
-import random
 
 # File configurations
 NUM_ROWS = 20538
+CHUNK_ROWS = 5000
 OUTPUT_FILE = "../data/kidney_disease_dataset.csv"
 
 # The 43 columns (Exact names must be maintained)
@@ -24,156 +24,152 @@ COLUMNS = [
     'Interleukin-6 (IL-6) level', 'Target'
 ]
 
-def generate_fuzzy_patient(status):
-    row = {}
-    
-    # Determine Status (0: Healthy, 1: Sick)
-    is_sick = False if status == 'No_Disease' else True
-    
-    # Determine Severity (0-4)
-    severity = 0
-    if status == 'Low_Risk': severity = 1
-    elif status == 'Moderate_Risk': severity = 2
-    elif status == 'High_Risk': severity = 3
-    elif status == 'Severe_Disease': severity = 4
+TARGETS = ['No_Disease', 'Low_Risk', 'Moderate_Risk', 'High_Risk', 'Severe_Disease']
+
+# The desired distribution: 65% Healthy, 35% Sick
+WEIGHTS = [0.65, 0.15, 0.10, 0.07, 0.03]
+
+def categorical(codes, categories):
+    # Categorical column from int8 codes into `categories`
+    return pd.Categorical.from_codes(codes.astype(np.int8), categories=categories)
+
+def flag(mask, false_label, true_label):
+    return categorical(mask, [false_label, true_label])
+
+def generate_fuzzy_patients(num_rows, rng):
+    """
+    Generate `num_rows` patients at once.
+    Every column is sampled as a full NumPy array, so there is no per-patient Python loop.
+    """
+    # One typed array per column (columnar layout), assembled into a DataFrame once at the end
+    cols = {}
+
+    # Determine Severity (0-4) straight from the target index, and Status (0: Healthy, 1: Sick)
+    severity = rng.choice(len(TARGETS), size=num_rows, p=WEIGHTS)
+    is_sick = severity > 0
 
     # === 1. Demographics and Lifestyle ===
-    row['Age of the patient'] = np.random.randint(18, 95)
-    row['Body Mass Index (BMI)'] = round(np.random.uniform(18.5, 40.0), 1)
-    
+    cols['Age of the patient'] = rng.integers(18, 95, num_rows, dtype=np.int32)
+    cols['Body Mass Index (BMI)'] = np.round(rng.uniform(18.5, 40.0, num_rows), 1)
+
     # Overlap logic: Healthy people can also have low activity/smoking habits
-    row['Physical activity level'] = np.random.choice(['low', 'moderate', 'high'], p=[0.4, 0.4, 0.2])
-    row['Smoking status'] = np.random.choice(['former', 'yes', 'no'], p=[0.2, 0.2, 0.6])
+    cols['Physical activity level'] = categorical(rng.choice(3, num_rows, p=[0.4, 0.4, 0.2]), ['low', 'moderate', 'high'])
+    cols['Smoking status'] = categorical(rng.choice(3, num_rows, p=[0.2, 0.2, 0.6]), ['former', 'yes', 'no'])
 
     # === 2. Chronic Diseases (Overlap Strategy) ===
     # Sick patients have a higher probability of HTN/DM, but not 100%
-    has_htn_prob = 0.70 if is_sick else 0.30 
-    has_dm_prob = 0.60 if is_sick else 0.25
-    
-    has_htn = np.random.choice(['yes', 'no'], p=[has_htn_prob, 1-has_htn_prob])
-    has_dm = np.random.choice(['yes', 'no'], p=[has_dm_prob, 1-has_dm_prob])
-    
-    row['Hypertension (yes/no)'] = has_htn
-    row['Diabetes mellitus (yes/no)'] = has_dm
-    row['Coronary artery disease (yes/no)'] = 'yes' if (is_sick and np.random.random() > 0.7) else 'no'
-    row['Family history of chronic kidney disease'] = np.random.choice(['yes', 'no'], p=[0.4, 0.6]) # Random inheritance
-
-    row['Duration of hypertension (years)'] = np.random.randint(1, 40) if has_htn == 'yes' else 0
-    row['Duration of diabetes mellitus (years)'] = np.random.randint(1, 30) if has_dm == 'yes' else 0
-
-    row['Blood pressure (mm/Hg)'] = np.random.randint(130, 190) if has_htn == 'yes' else np.random.randint(90, 125)
-    row['Random blood glucose level (mg/dl)'] = np.random.randint(150, 450) if has_dm == 'yes' else np.random.randint(70, 140)
+    has_htn = rng.random(num_rows) < np.where(is_sick, 0.70, 0.30)
+    has_dm = rng.random(num_rows) < np.where(is_sick, 0.60, 0.25)
+
+    cols['Hypertension (yes/no)'] = flag(has_htn, 'no', 'yes')
+    cols['Diabetes mellitus (yes/no)'] = flag(has_dm, 'no', 'yes')
+    cols['Coronary artery disease (yes/no)'] = flag(is_sick & (rng.random(num_rows) > 0.7), 'no', 'yes')
+    cols['Family history of chronic kidney disease'] = flag(rng.random(num_rows) < 0.4, 'no', 'yes') # Random inheritance
+
+    cols['Duration of hypertension (years)'] = np.where(has_htn, rng.integers(1, 40, num_rows, dtype=np.int32), 0)
+    cols['Duration of diabetes mellitus (years)'] = np.where(has_dm, rng.integers(1, 30, num_rows, dtype=np.int32), 0)
+
+    cols['Blood pressure (mm/Hg)'] = np.where(has_htn, rng.integers(130, 190, num_rows, dtype=np.int32), rng.integers(90, 125, num_rows, dtype=np.int32))
+    cols['Random blood glucose level (mg/dl)'] = np.where(has_dm, rng.integers(150, 450, num_rows, dtype=np.int32), rng.integers(70, 140, num_rows, dtype=np.int32))
 
     # === 3. Kidney Function (The Gray Zone) ===
     # Using Normal Distribution to ensure continuous overlap
-    
-    if is_sick:
-        # Sick: Values start from the high end of normal range (1.0)
-        scr_mean = 1.2 + (severity * 0.5) 
-        scr = np.random.normal(scr_mean, 0.4)
-        scr = max(0.9, scr) # Minimum value for sick patients is 0.9
-        
-        egfr = max(5, min(100, np.random.normal(90 - (severity * 20), 15)))
-        
-        cystatin = max(0.8, np.random.normal(1.0 + (severity * 0.3), 0.5))
-        bun = max(15, np.random.normal(30 + (severity * 10), 15))
-        
-    else:
-        # Healthy: Values may reach into the sick range (1.5) due to noise
-        scr = np.random.normal(0.9, 0.2)
-        scr = max(0.5, min(1.5, scr)) 
-        
-        egfr = max(60, min(140, np.random.normal(105, 15)))
-        cystatin = max(0.5, min(1.1, np.random.normal(0.8, 0.15)))
-        bun = max(7, min(45, np.random.normal(25, 8)))
-
-    row['Serum creatinine (mg/dl)'] = round(scr, 2)
-    row['Estimated Glomerular Filtration Rate (eGFR)'] = round(egfr, 2)
-    row['Blood urea (mg/dl)'] = round(bun, 2)
-    row['Cystatin C level'] = round(cystatin, 2)
+    # Sick: Values start from the high end of normal range (1.0), minimum value for sick patients is 0.9
+    # Healthy: Values may reach into the sick range (1.5) due to noise
+    scr = np.where(
+        is_sick,
+        np.maximum(0.9, rng.normal(1.2 + severity * 0.5, 0.4)),
+        np.clip(rng.normal(0.9, 0.2, num_rows), 0.5, 1.5)
+    )
+    egfr = np.where(
+        is_sick,
+        np.clip(rng.normal(90 - severity * 20, 15), 5, 100),
+        np.clip(rng.normal(105, 15, num_rows), 60, 140)
+    )
+    cystatin = np.where(
+        is_sick,
+        np.maximum(0.8, rng.normal(1.0 + severity * 0.3, 0.5)),
+        np.clip(rng.normal(0.8, 0.15, num_rows), 0.5, 1.1)
+    )
+    bun = np.where(
+        is_sick,
+        np.maximum(15, rng.normal(30 + severity * 10, 15)),
+        np.clip(rng.normal(25, 8, num_rows), 7, 45)
+    )
+
+    cols['Serum creatinine (mg/dl)'] = np.round(scr, 2)
+    cols['Estimated Glomerular Filtration Rate (eGFR)'] = np.round(egfr, 2)
+    cols['Blood urea (mg/dl)'] = np.round(bun, 2)
+    cols['Cystatin C level'] = np.round(cystatin, 2)
 
     # === 4. Electrolytes (Late Stage Disruption) ===
     # Electrolytes are mainly affected in severe stages (severity >= 3)
-    if severity >= 3: 
-        row['Sodium level (mEq/L)'] = round(np.random.uniform(125, 138), 1)
-        row['Potassium level (mEq/L)'] = round(np.random.uniform(5.0, 7.0), 1)
-    else:
-        # Early stages and healthy patients share similar ranges
-        row['Sodium level (mEq/L)'] = round(np.random.uniform(135, 146), 1)
-        row['Potassium level (mEq/L)'] = round(np.random.uniform(3.5, 5.1), 1)
-
-    row['Serum calcium level'] = round(np.random.uniform(8.0, 10.5), 1)
-    row['Serum phosphate level'] = round(np.random.uniform(2.5, 5.0), 1)
-    row['Parathyroid hormone (PTH) level'] = round(np.random.uniform(15, 80) if severity < 2 else np.random.uniform(70, 400), 1)
+    # Early stages and healthy patients share similar ranges
+    late_stage = severity >= 3
+    cols['Sodium level (mEq/L)'] = np.round(np.where(late_stage, rng.uniform(125, 138, num_rows), rng.uniform(135, 146, num_rows)), 1)
+    cols['Potassium level (mEq/L)'] = np.round(np.where(late_stage, rng.uniform(5.0, 7.0, num_rows), rng.uniform(3.5, 5.1, num_rows)), 1)
+
+    cols['Serum calcium level'] = np.round(rng.uniform(8.0, 10.5, num_rows), 1)
+    cols['Serum phosphate level'] = np.round(rng.uniform(2.5, 5.0, num_rows), 1)
+    cols['Parathyroid hormone (PTH) level'] = np.round(np.where(severity < 2, rng.uniform(15, 80, num_rows), rng.uniform(70, 400, num_rows)), 1)
 
     # === 5. Blood Analysis (Anemia is NOT a guaranteed CKD sign) ===
-    hb_mean = 10.0 if severity >= 3 else 13.5
-    hb = np.random.normal(hb_mean, 2.0)
-    hb = max(6.0, min(17.5, hb))
-    
-    row['Hemoglobin level (gms)'] = round(hb, 1)
-    row['Packed cell volume (%)'] = round(hb * 3, 1) # Medical approximation
-    row['Anemia (yes/no)'] = 'yes' if hb < 11.0 else 'no'
-    
-    row['White blood cell count (cells/cumm)'] = np.random.randint(3000, 15000)
-    row['Red blood cell count (millions/cumm)'] = round(hb/3 + np.random.uniform(-0.2, 0.2), 1)
-    row['Cholesterol level'] = np.random.randint(120, 300) # Random across the board
+    hb_mean = np.where(late_stage, 10.0, 13.5)
+    hb = np.clip(rng.normal(hb_mean, 2.0), 6.0, 17.5)
+
+    cols['Hemoglobin level (gms)'] = np.round(hb, 1)
+    cols['Packed cell volume (%)'] = np.round(hb * 3, 1) # Medical approximation
+    cols['Anemia (yes/no)'] = flag(hb < 11.0, 'no', 'yes')
+
+    cols['White blood cell count (cells/cumm)'] = rng.integers(3000, 15000, num_rows, dtype=np.int32)
+    cols['Red blood cell count (millions/cumm)'] = np.round(hb / 3 + rng.uniform(-0.2, 0.2, num_rows), 1)
+    cols['Cholesterol level'] = rng.integers(120, 300, num_rows, dtype=np.int32) # Random across the board
 
     # === 6. Urine Analysis (No Zeroes Policy) ===
-    row['Specific gravity of urine'] = np.random.choice([1.005, 1.010, 1.015, 1.020, 1.025])
-    
-    if is_sick:
-        # Higher chance of issues, but not guaranteed
-        row['Albumin in urine'] = np.random.choice([0, 1, 2, 3, 4, 5], p=[0.1, 0.2, 0.2, 0.2, 0.2, 0.1])
-        row['Urine protein-to-creatinine ratio'] = round(np.random.uniform(0.5, 6.0), 1)
-        is_urine_bad = np.random.choice([True, False], p=[0.6, 0.4]) # 40% of sick patients have normal urine
-    else:
-        # Low chance of issues for healthy patients
-        row['Albumin in urine'] = np.random.choice([0, 1], p=[0.9, 0.1])
-        row['Urine protein-to-creatinine ratio'] = round(np.random.uniform(0.1, 0.3), 1)
-        is_urine_bad = False
-
-    row['Red blood cells in urine'] = 'abnormal' if is_urine_bad else 'normal'
-    row['Pus cells in urine'] = 'abnormal' if is_urine_bad else 'normal'
-    row['Bacteria in urine'] = np.random.choice(['present', 'not present'], p=[0.1, 0.9])
-    row['Pus cell clumps in urine'] = 'not present'
-    row['Urinary sediment microscopy results'] = 'abnormal' if is_urine_bad else 'normal'
+    cols['Specific gravity of urine'] = rng.choice([1.005, 1.010, 1.015, 1.020, 1.025], num_rows)
+
+    # Sick: Higher chance of issues, but not guaranteed (40% of sick patients have normal urine)
+    # Healthy: Low chance of issues
+    cols['Albumin in urine'] = np.where(
+        is_sick,
+        rng.choice(np.arange(6, dtype=np.int32), num_rows, p=[0.1, 0.2, 0.2, 0.2, 0.2, 0.1]),
+        rng.choice(np.arange(2, dtype=np.int32), num_rows, p=[0.9, 0.1])
+    )
+    cols['Urine protein-to-creatinine ratio'] = np.round(np.where(is_sick, rng.uniform(0.5, 6.0, num_rows), rng.uniform(0.1, 0.3, num_rows)), 1)
+    is_urine_bad = is_sick & (rng.random(num_rows) < 0.6)
+
+    cols['Red blood cells in urine'] = flag(is_urine_bad, 'normal', 'abnormal')
+    cols['Pus cells in urine'] = flag(is_urine_bad, 'normal', 'abnormal')
+    cols['Bacteria in urine'] = flag(rng.random(num_rows) < 0.1, 'not present', 'present')
+    cols['Pus cell clumps in urine'] = categorical(np.zeros(num_rows), ['not present'])
+    cols['Urinary sediment microscopy results'] = flag(is_urine_bad, 'normal', 'abnormal')
 
     # Sugar in urine is tied to diabetes status, not directly to CKD severity
-    row['Sugar in urine'] = np.random.choice([1, 2, 3, 4, 5]) if has_dm == 'yes' else 0
-    row['Urine output (ml/day)'] = np.random.randint(500, 2500)
+    cols['Sugar in urine'] = np.where(has_dm, rng.integers(1, 6, num_rows, dtype=np.int32), 0)
+    cols['Urine output (ml/day)'] = rng.integers(500, 2500, num_rows, dtype=np.int32)
 
     # === 7. Inflammation & Symptoms ===
     # CRP/IL-6: Higher baseline for sick patients but high values can occur in healthy people too
-    crp_base = 10 if is_sick else 2
-    row['C-reactive protein (CRP) level'] = round(max(0, np.random.normal(crp_base, 5)), 1)
-    
-    il6_base = 8 if is_sick else 1
-    row['Interleukin-6 (IL-6) level'] = round(max(0, np.random.normal(il6_base, 3)), 1)
-    
-    row['Serum albumin level'] = round(np.random.uniform(2.5, 5.2), 1) # Range covers sick (low) and healthy (high)
-    row['Appetite (good/poor)'] = 'poor' if (is_sick and severity >= 3) else 'good'
-    row['Pedal edema (yes/no)'] = 'yes' if (is_sick and severity >= 3) else 'no'
-
-    row['Target'] = status
-
-    return row
+    crp_base = np.where(is_sick, 10, 2)
+    cols['C-reactive protein (CRP) level'] = np.round(np.maximum(0, rng.normal(crp_base, 5)), 1)
 
-# --- Execution ---
-print("Generating Fuzzy & Realistic Medical Data...")
-data_rows = []
-targets = ['No_Disease', 'Low_Risk', 'Moderate_Risk', 'High_Risk', 'Severe_Disease']
+    il6_base = np.where(is_sick, 8, 1)
+    cols['Interleukin-6 (IL-6) level'] = np.round(np.maximum(0, rng.normal(il6_base, 3)), 1)
 
-# The desired distribution: 65% Healthy, 35% Sick
-weights = [0.65, 0.15, 0.10, 0.07, 0.03] 
+    cols['Serum albumin level'] = np.round(rng.uniform(2.5, 5.2, num_rows), 1) # Range covers sick (low) and healthy (high)
+    cols['Appetite (good/poor)'] = flag(late_stage, 'good', 'poor')
+    cols['Pedal edema (yes/no)'] = flag(late_stage, 'no', 'yes')
 
-patient_statuses = np.random.choice(targets, size=NUM_ROWS, p=weights)
+    cols['Target'] = categorical(severity, TARGETS)
 
-for status in patient_statuses:
-    data_rows.append(generate_fuzzy_patient(status))
+    return pd.DataFrame(cols, columns=COLUMNS, copy=False)
 
-df_new = pd.DataFrame(data_rows)
-df_new = df_new[COLUMNS]
+# --- Execution ---
+print("Generating Fuzzy & Realistic Medical Data...")
+rng = np.random.default_rng()
 
-df_new.to_csv(OUTPUT_FILE, index=False)
-print(f"✅ Generated {NUM_ROWS} rows. Final check: All 43 columns have been assigned values and class imbalance is 65/35.")
\ No newline at end of file
+# Generate and write in chunks so peak memory stays O(CHUNK_ROWS) however large NUM_ROWS gets
+for start in range(0, NUM_ROWS, CHUNK_ROWS):
+    df_chunk = generate_fuzzy_patients(min(CHUNK_ROWS, NUM_ROWS - start), rng)
+    df_chunk.to_csv(OUTPUT_FILE, mode='w' if start == 0 else 'a', header=(start == 0), index=False)
+print(f"✅ Generated {NUM_ROWS} rows. Final check: All 43 columns have been assigned values and class imbalance is 65/35.")
